@@ -1,15 +1,15 @@
-from motor.motor_asyncio import AsyncIOMotorClient
-from utils.config import MONGO_URI
+from utils.mongo import get_mongo_client
 from .db_service import DatabaseService
 
-mongo_client = AsyncIOMotorClient(MONGO_URI, tlsAllowInvalidCertificates=True)
+mongo_client = get_mongo_client()
 
-resident_db = mongo_client["resident"]
-resident_collection = resident_db["resident_info"]
+db_service = DatabaseService(mongo_client)
 
-caregiver_db = mongo_client["caregiver"]
-users_collection = caregiver_db["users"]
-tasks_collection = caregiver_db["tasks"]
-activities_collection = caregiver_db["activities"]
+# Collection handles shared with the database service
+resident_db = db_service.resident_db
+resident_collection = db_service.resident_collection
 
-db_service = DatabaseService(mongo_client)
+caregiver_db = db_service.caregiver_db
+users_collection = db_service.user_collection
+tasks_collection = db_service.caregiver_task_collection
+activities_collection = caregiver_db["activities"]
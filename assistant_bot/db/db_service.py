@@ -1,11 +1,41 @@
 from typing import Dict, Any, Optional
+import asyncio
 import logging
 from datetime import datetime
 from datetime import timezone
 from bson import ObjectId
+from pymongo.write_concern import WriteConcern
+from cachetools import TTLCache
+from utils.mongo import CASE_INSENSITIVE
 
 logger = logging.getLogger(__name__)
 
+# Fields read by format_resident_response
+RESIDENT_PROFILE_PROJECTION = {
+    "_id": 1,
+    "full_name": 1,
+    "room_number": 1,
+    "medical_conditions": 1,
+    "medications": 1,
+    "notes": 1,
+}
+
+RESIDENT_TASK_PROJECTION = {
+    "task_title": 1,
+    "status": 1,
+    "assigned_to_name": 1,
+    "start_date": 1,
+}
+
+
+def prefix_range(text: str) -> Dict[str, str]:
+    """Range matching values that start with text; use with CASE_INSENSITIVE
+
+    U+FFFF sorts after every other character in ICU collations, so the range
+    can be answered from a collation index, unlike a regex.
+    """
+    return {"$gte": text, "$lt": text + "\uffff"}
+
 
 class DatabaseService:
     def __init__(self, mongo_client):
@@ -16,61 +46,182 @@ class DatabaseService:
         self.resident_collection = self.resident_db["resident_info"]
         self.task_collection = self.resident_db["task"]
         self.user_collection = self.caregiver_db["users"]
+        self.caregiver_task_collection = self.caregiver_db["tasks"]
+        # Note appends only wait for the primary, not a majority of the replica set
+        self.resident_notes_collection = self.resident_collection.with_options(
+            write_concern=WriteConcern(w=1)
+        )
+
+        # Normalized name -> resident, so follow-up questions skip the database
+        self.resident_name_cache = TTLCache(maxsize=1024, ttl=60)
+        self.resident_name_lookups = {}
+        # Resident lists for /residents and /voicenote; the roster rarely changes
+        self.resident_list_cache = TTLCache(maxsize=16, ttl=60)
+
+    async def ensure_indexes(self):
+        """Create the indexes the bot's queries rely on, each independently"""
+        indexes = [
+            # Case-insensitive exact and prefix name lookups
+            (
+                self.resident_collection,
+                "full_name",
+                {"name": "full_name_ci", "collation": CASE_INSENSITIVE},
+            ),
+            (self.resident_collection, [("full_name", "text")], {}),
+            # Sorted, names-only /residents listing
+            (self.resident_collection, "full_name", {}),
+            (
+                self.task_collection,
+                [("resident_id", 1), ("due_time", 1)],
+                {"name": "resident_due"},
+            ),
+            (
+                self.user_collection,
+                "telegram_handle",
+                {"name": "telegram_handle_ci", "collation": CASE_INSENSITIVE},
+            ),
+        ]
+        # One index per branch of the task query's start_date / recurring $or,
+        # plus the overdue (pending, due before now) filter
+        indexes += [
+            (self.task_collection, "start_date", {}),
+            (
+                self.task_collection,
+                [("recurring", 1), ("recurring_days", 1)],
+                {
+                    "name": "recurring_days",
+                    "partialFilterExpression": {"recurring": True},
+                },
+            ),
+            (
+                self.task_collection,
+                [("status", 1), ("due_date", 1)],
+                {"name": "status_due_date"},
+            ),
+        ]
+
+        # A failure (e.g. a conflicting existing index) shouldn't stop the rest
+        for collection, keys, options in indexes:
+            try:
+                await collection.create_index(keys, **options)
+            except Exception as e:
+                index_name = options.get("name", keys)
+                logger.error(
+                    f"Error creating index {index_name} on {collection.name}: {str(e)}"
+                )
 
     async def get_resident_by_name(self, name: str) -> Optional[Dict[str, Any]]:
-        """Find a resident by name (partial match)"""
-        try:
-            if not name:
-                return None
+        """Find a resident by name, serving repeat lookups from the name cache"""
+        if not name:
+            return None
 
-            name = " ".join(name.split()).strip()
-            logger.info(f"Searching for resident with name: '{name}'")
+        name = " ".join(name.split()).strip().lower()
 
-            query = {"full_name": {"$regex": f"^{name}$", "$options": "i"}}
-            resident = await self.resident_collection.find_one(query)
+        resident = self.resident_name_cache.get(name)
+        if resident is not None:
+            logger.info("Found resident in cache: %s", resident.get("full_name"))
+            return resident
+
+        # Concurrent lookups for the same name share a single database query
+        lookup = self.resident_name_lookups.get(name)
+        if lookup is None:
+            lookup = asyncio.ensure_future(self.lookup_resident_by_name(name))
+            self.resident_name_lookups[name] = lookup
+            lookup.add_done_callback(
+                lambda _: self.resident_name_lookups.pop(name, None)
+            )
+
+        resident = await asyncio.shield(lookup)
+        if resident:
+            self.resident_name_cache[name] = resident
+        return resident
+
+    async def lookup_resident_by_name(self, name: str) -> Optional[Dict[str, Any]]:
+        """Find a resident by normalized name (exact, prefix, then word match)"""
+        try:
+            logger.info("Searching for resident with name: '%s'", name)
+
+            resident = await self.resident_collection.find_one(
+                {"full_name": name},
+                RESIDENT_PROFILE_PROJECTION,
+                collation=CASE_INSENSITIVE,
+            )
 
             if resident:
                 logger.info(
-                    f"Found resident by exact match: {resident.get('full_name')}"
+                    "Found resident by exact match: %s", resident.get("full_name")
                 )
                 return resident
 
-            query = {"full_name": {"$regex": f".*{name}.*", "$options": "i"}}
-            resident = await self.resident_collection.find_one(query)
+            resident = await self.resident_collection.find_one(
+                {"full_name": prefix_range(name)},
+                RESIDENT_PROFILE_PROJECTION,
+                collation=CASE_INSENSITIVE,
+            )
 
             if resident:
                 logger.info(
-                    f"Found resident by partial full name match: {resident.get('full_name')}"
+                    "Found resident by full name prefix match: %s",
+                    resident.get("full_name"),
                 )
                 return resident
 
-            name_parts = name.split()
-            if len(name_parts) > 0:
-                name_queries = []
-                for part in name_parts:
-                    if len(part) > 2:
-                        name_queries.append(
-                            {"full_name": {"$regex": f"\\b{part}\\b", "$options": "i"}}
-                        )
-
-                if name_queries:
-                    query = {"$or": name_queries}
-                    resident = await self.resident_collection.find_one(query)
-
-                    if resident:
-                        logger.info(
-                            f"Found resident by name part match: {resident.get('full_name')}"
-                        )
-                        return resident
-
-            logger.info(f"No resident found matching name: '{name}'")
+            # Match any whole name word with a single text index query
+            name_parts = [part for part in name.split() if len(part) > 2]
+            if name_parts:
+                resident = await self.resident_collection.find_one(
+                    {"$text": {"$search": " ".join(name_parts)}},
+                    {**RESIDENT_PROFILE_PROJECTION, "score": {"$meta": "textScore"}},
+                    sort=[("score", {"$meta": "textScore"})],
+                )
+
+                if resident:
+                    logger.info(
+                        "Found resident by name part match: %s",
+                        resident.get("full_name"),
+                    )
+                    return resident
+
+            logger.info("No resident found matching name: '%s'", name)
             return None
         except Exception as e:
             logger.error(f"Error finding resident: {str(e)}")
             return None
 
-    async def get_resident_tasks(self, resident_id, time_range):
+    async def search_residents(self, query: str, limit=5):
+        """Find residents whose name matches the query words (text index search)"""
         try:
+            query = " ".join(query.split()).strip()
+            if not query:
+                return []
+
+            cursor = (
+                self.resident_collection.find(
+                    {"$text": {"$search": query}},
+                    {"_id": 0, "full_name": 1, "score": {"$meta": "textScore"}},
+                )
+                .sort([("score", {"$meta": "textScore"})])
+                .limit(limit)
+            )
+            residents = await cursor.to_list(length=limit)
+            if residents:
+                return residents
+
+            # Text search only matches whole words, so fall back to a prefix
+            # match to handle partially typed names
+            cursor = self.resident_collection.find(
+                {"full_name": prefix_range(query)},
+                {"_id": 0, "full_name": 1},
+                collation=CASE_INSENSITIVE,
+            ).limit(limit)
+            return await cursor.to_list(length=limit)
+        except Exception as e:
+            logger.error(f"Error searching residents for '{query}': {str(e)}")
+            return []
+
+    async def get_resident_tasks(self, resident_id, time_range=None):
+        try:
+            time_range = time_range or {}
             start_time = time_range.get("start")
             end_time = time_range.get("end")
 
@@ -81,7 +232,7 @@ class DatabaseService:
             if start_time and end_time:
                 query["due_time"] = {"$gte": start_time, "$lte": end_time}
 
-            cursor = self.task_collection.find(query)
+            cursor = self.task_collection.find(query, RESIDENT_TASK_PROJECTION)
             tasks = await cursor.to_list(length=50)
             return tasks
         except Exception as e:
@@ -89,16 +240,39 @@ class DatabaseService:
             return []
 
     async def get_all_residents(self, limit=50):
+        cache_key = ("residents", limit)
+        residents = self.resident_list_cache.get(cache_key)
+        if residents is not None:
+            return residents
+
         try:
             cursor = self.resident_collection.find(
                 {}, {"_id": 1, "full_name": 1, "room_number": 1}
             )
             residents = await cursor.to_list(length=limit)
+            self.resident_list_cache[cache_key] = residents
             return residents
         except Exception as e:
             logger.error(f"Error fetching all residents: {str(e)}")
             return []
 
+    async def get_resident_names(self, limit=50):
+        """Sorted resident names, cached; database errors are left to the caller"""
+        cache_key = ("names", limit)
+        names = self.resident_list_cache.get(cache_key)
+        if names is not None:
+            return names
+
+        # Names only, sorted on the full_name index, so the query is covered
+        cursor = (
+            self.resident_collection.find({}, {"_id": 0, "full_name": 1})
+            .sort("full_name")
+            .limit(limit)
+        )
+        names = [resident.get("full_name", "Unnamed") async for resident in cursor]
+        self.resident_list_cache[cache_key] = names
+        return names
+
     async def get_tasks(self, query_filters: Dict[str, Any], limit=50):
         """Get tasks based on query filters"""
         try:
@@ -124,30 +298,25 @@ class DatabaseService:
                 logger.error(f"Invalid resident ID: {resident_id}")
                 return False
 
-            resident = await self.resident_collection.find_one(
-                {"_id": ObjectId(resident_id)}
-            )
-            if not resident:
-                logger.error(f"Resident not found with ID: {resident_id}")
-                return False
-
-            current_notes = resident.get("additional_notes", [])
-            current_timestamps = resident.get("additional_notes_timestamp", [])
-
-            new_notes = current_notes + [note]
-            new_timestamps = current_timestamps + [datetime.now(timezone.utc)]
-
-            result = await self.resident_collection.update_one(
-                {"_id": ObjectId(resident_id)},
+            oid = ObjectId(resident_id)
+            now = datetime.now(timezone.utc)
+            result = await self.resident_notes_collection.update_one(
+                {"_id": oid},
                 {
-                    "$set": {
-                        "additional_notes": new_notes,
-                        "additional_notes_timestamp": new_timestamps,
+                    "$push": {
+                        "additional_notes": note,
+                        "additional_notes_timestamp": now,
                     }
                 },
             )
 
-            return result.modified_count > 0
+            if result.matched_count == 0:
+                logger.error(f"Resident not found with ID: {resident_id}")
+                return False
+
+            self.resident_name_cache.clear()
+            self.resident_list_cache.clear()
+            return True
         except Exception as e:
             logger.error(f"Error adding note to resident {resident_id}: {str(e)}")
             return False
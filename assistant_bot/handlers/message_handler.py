@@ -1,14 +1,20 @@
 import logging
-from typing import Dict, Any
+import re
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, Tuple
+from cachetools import TTLCache
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
+from telegram.helpers import escape_markdown
 
 from ..db.db_service import DatabaseService
-from .query_handler import parse_query
+from .query_handler import parse_query, resolve_time_range
 from .response_handler import (
     format_task_response,
     format_activity_response,
     format_resident_response,
+    truncate_response,
+    MAX_MESSAGE_LENGTH,
     RESPONSE_TEMPLATES,
 )
 
@@ -16,7 +22,80 @@ logger = logging.getLogger(__name__)
 
 db = None
 
-user_context = {}
+FOLLOW_UP_PATTERN = re.compile(
+    r"\b(?:what about|how about|and|also|what else)\b", re.IGNORECASE
+)
+
+
+@dataclass(slots=True)
+class UserContext:
+    last_query: Optional[str] = None
+    last_resident: Optional[str] = None
+    last_task_type: Optional[str] = None
+    last_time_keyword: Optional[Tuple] = None
+
+
+# Per-user follow-up context; idle users are evicted after an hour
+user_context = TTLCache(maxsize=10_000, ttl=3600)
+
+TASK_QUERY_KEYBOARD = InlineKeyboardMarkup(
+    [
+        [
+            InlineKeyboardButton("Show Overdue Tasks", callback_data="overdue_tasks"),
+            InlineKeyboardButton("Show Today's Tasks", callback_data="today_tasks"),
+        ]
+    ]
+)
+
+
+def get_user_context(user_id: int) -> UserContext:
+    """Follow-up context for a user, created on first use and kept alive on access"""
+    context = user_context.get(user_id)
+    if context is None:
+        context = UserContext()
+    # Re-inserting restarts the entry's TTL, so only idle users expire
+    user_context[user_id] = context
+    return context
+
+
+def get_reply_target(update: Update):
+    """Message to reply to, whether the update is a message or a button press"""
+    callback_query = update.callback_query
+    return callback_query.message if callback_query else update.message
+
+
+async def send_chunked(
+    message, parts, limit=MAX_MESSAGE_LENGTH, reply_markup=None, **kwargs
+) -> None:
+    """Reply with parts packed, in order, into as few messages as fit the limit"""
+    chunks, current, size = [], [], 0
+    for part in parts:
+        if current and size + len(part) > limit:
+            chunks.append("".join(current))
+            current, size = [], 0
+        current.append(part)
+        size += len(part)
+    if current:
+        chunks.append("".join(current))
+
+    last = len(chunks) - 1
+    for index, chunk in enumerate(chunks):
+        # Only the first message notifies and only the last carries the keyboard;
+        # a single oversized part is truncated
+        await message.reply_text(
+            truncate_response(chunk),
+            disable_notification=index > 0,
+            reply_markup=reply_markup if index == last else None,
+            **kwargs,
+        )
+
+
+async def send_typing(chat) -> None:
+    """Show the typing indicator; failing to show it shouldn't fail the reply"""
+    try:
+        await chat.send_action(action="typing")
+    except Exception as e:
+        logger.warning(f"Error sending typing action: {str(e)}")
 
 
 def init_handler(database_service: DatabaseService):
@@ -29,15 +108,8 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         user_id = update.effective_user.id
         message_text = update.message.text.strip().lower()
 
-        await update.message.chat.send_action(action="typing")
-
-        if user_id not in user_context:
-            user_context[user_id] = {
-                "last_query": None,
-                "last_resident": None,
-                "last_task_type": None,
-                "last_time_range": None,
-            }
+        # Sent before the reply, so the indicator can't outlive the answer
+        await send_typing(update.message.chat)
 
         if is_follow_up_question(message_text, user_id):
             await handle_follow_up(update, user_id)
@@ -47,14 +119,11 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         time_range = params.get("time_range", {})
         filters = params.get("filters", {})
 
-        user_context[user_id].update(
-            {
-                "last_query": intent,
-                "last_resident": filters.get("resident_name"),
-                "last_task_type": filters.get("task_type"),
-                "last_time_range": time_range,
-            }
-        )
+        user_state = get_user_context(user_id)
+        user_state.last_query = intent
+        user_state.last_resident = filters.get("resident_name")
+        user_state.last_task_type = filters.get("task_type")
+        user_state.last_time_keyword = params.get("time_keyword")
 
         if intent == "task_query":
             await handle_task_query(update, time_range, filters)
@@ -71,27 +140,27 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
 
 
 def is_follow_up_question(message: str, user_id: int) -> bool:
-    follow_up_indicators = ["what about", "how about", "and", "also", "what else"]
-    return any(indicator in message for indicator in follow_up_indicators)
+    return bool(FOLLOW_UP_PATTERN.search(message))
 
 
 async def handle_follow_up(update: Update, user_id: int) -> None:
-    context = user_context[user_id]
-    if not context["last_query"]:
+    context = get_user_context(user_id)
+    if not context.last_query:
         await handle_general_query(update)
         return
 
-    time_range = context["last_time_range"] or {}
+    # Re-resolved so a follow-up on "today" still means today
+    time_range = resolve_time_range(context.last_time_keyword)
     filters = {
-        "resident_name": context["last_resident"],
-        "task_type": context["last_task_type"],
+        "resident_name": context.last_resident,
+        "task_type": context.last_task_type,
     }
 
-    if context["last_query"] == "task_query":
+    if context.last_query == "task_query":
         await handle_task_query(update, time_range, filters)
-    elif context["last_query"] == "activity_query":
+    elif context.last_query == "activity_query":
         await handle_activity_query(update, time_range, filters)
-    elif context["last_query"] == "resident_query":
+    elif context.last_query == "resident_query":
         await handle_resident_query(update, time_range, filters)
 
 
@@ -110,7 +179,7 @@ async def handle_task_query(
                     hour=23, minute=59, second=59, microsecond=999999
                 )
 
-                logger.info(f"Today's date range: {today_start} to {today_end}")
+                logger.info("Today's date range: %s to %s", today_start, today_end)
 
                 query_filters["$or"] = [
                     {"start_date": {"$gte": today_start, "$lte": today_end}},
@@ -130,11 +199,7 @@ async def handle_task_query(
         tasks = await db.get_tasks(query_filters)
 
         if not tasks:
-            message = (
-                update.callback_query.message
-                if update.callback_query
-                else update.message
-            )
+            message = get_reply_target(update)
 
             if filters.get("status") == "pending" and filters.get("due_date", {}).get(
                 "$lt"
@@ -146,30 +211,16 @@ async def handle_task_query(
             await message.reply_text(response, parse_mode="Markdown")
             return
 
-        response = format_task_response(tasks)
-
-        keyboard = [
-            [
-                InlineKeyboardButton(
-                    "Show Overdue Tasks", callback_data="overdue_tasks"
-                ),
-                InlineKeyboardButton("Show Today's Tasks", callback_data="today_tasks"),
-            ]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-
-        message = (
-            update.callback_query.message if update.callback_query else update.message
-        )
-        await message.reply_text(
-            response, parse_mode="Markdown", reply_markup=reply_markup
+        await send_chunked(
+            get_reply_target(update),
+            format_task_response(tasks),
+            parse_mode="Markdown",
+            reply_markup=TASK_QUERY_KEYBOARD,
         )
 
     except Exception as e:
         logger.error(f"Error handling task query: {str(e)}")
-        message = (
-            update.callback_query.message if update.callback_query else update.message
-        )
+        message = get_reply_target(update)
         await message.reply_text(RESPONSE_TEMPLATES["error"])
 
 
@@ -219,8 +270,9 @@ async def handle_activity_query(
 
         activities = await db.get_activities(query_filters)
 
-        response = format_activity_response(activities)
-        await update.message.reply_text(response, parse_mode="Markdown")
+        await send_chunked(
+            update.message, format_activity_response(activities), parse_mode="Markdown"
+        )
 
     except Exception as e:
         logger.error(f"Error handling activity query: {str(e)}")
@@ -235,34 +287,27 @@ async def handle_resident_query(
         resident = await db.get_resident_by_name(resident_name)
 
         if not resident:
-            message = (
-                update.callback_query.message
-                if update.callback_query
-                else update.message
-            )
-            await message.reply_text(
-                "No residents found matching your criteria.", parse_mode="Markdown"
-            )
-            return
+            message = get_reply_target(update)
+            response = "No residents found matching your criteria."
+            suggestions = await get_resident_suggestions(resident_name)
+            if suggestions:
+                response += f"\n\n{suggestions}"
 
-        tasks = []
-        if time_range:
-            tasks = await db.get_resident_tasks(str(resident["_id"]), time_range)
-        else:
-            tasks = await db.get_resident_tasks(str(resident["_id"]))
+            await message.reply_text(response, parse_mode="Markdown")
+            return
 
-        response = format_resident_response(resident, tasks)
+        # Tasks are keyed on the resident's _id, so this can't overlap the lookup
+        tasks = await db.get_resident_tasks(str(resident["_id"]), time_range)
 
-        message = (
-            update.callback_query.message if update.callback_query else update.message
+        await send_chunked(
+            get_reply_target(update),
+            format_resident_response(resident, tasks),
+            parse_mode="Markdown",
         )
-        await message.reply_text(response, parse_mode="Markdown")
 
     except Exception as e:
         logger.error(f"Error handling resident query: {str(e)}")
-        message = (
-            update.callback_query.message if update.callback_query else update.message
-        )
+        message = get_reply_target(update)
         await message.reply_text(RESPONSE_TEMPLATES["error"])
 
 
@@ -272,6 +317,13 @@ async def get_resident_suggestions(query: str) -> str:
     if len(query) < 3:
         suggestions.append("Try using a longer search term.")
     else:
+        residents = await db.search_residents(query)
+        if residents:
+            # The reply is sent as Markdown, so a stray _ or * in a name would break it
+            names = ", ".join(
+                escape_markdown(r.get("full_name", "Unnamed")) for r in residents
+            )
+            suggestions.append(f"Did you mean: {names}?")
         suggestions.append("Check for spelling errors in the name.")
         suggestions.append("Try searching for the resident's last name only.")
         suggestions.append("Try searching with fewer characters to get more results.")
@@ -298,35 +350,21 @@ async def handle_general_query(update: Update) -> None:
 
 async def list_all_residents(update: Update) -> None:
     try:
-        residents = await db.resident_collection.find({}, {"full_name": 1}).to_list(
-            length=50
-        )
+        names = await db.get_resident_names(limit=50)
 
-        if not residents:
-            message = (
-                update.callback_query.message
-                if update.callback_query
-                else update.message
-            )
+        if not names:
+            message = get_reply_target(update)
             await message.reply_text("No residents found in the database.")
             return
 
-        response = "👵👴 Resident List:\n\n"
-        for idx, resident in enumerate(residents, start=1):
-            name = resident.get("full_name", "Unnamed")
-            response += f"{idx}. {name}\n"
-
-        message = (
-            update.callback_query.message if update.callback_query else update.message
-        )
-        await message.reply_text(response)
-        logger.info(f"Sent list of {len(residents)} residents")
+        lines = ["👵👴 Resident List:\n\n"]
+        lines.extend(f"{i}. {name}\n" for i, name in enumerate(names, 1))
+        await send_chunked(get_reply_target(update), lines)
+        logger.info("Sent list of %s residents", len(names))
 
     except Exception as e:
         logger.error(f"Error listing residents: {str(e)}")
-        message = (
-            update.callback_query.message if update.callback_query else update.message
-        )
+        message = get_reply_target(update)
         await message.reply_text(
             "Sorry, I couldn't retrieve the resident list. Please try again later."
         )
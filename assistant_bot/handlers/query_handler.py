@@ -1,97 +1,174 @@
 import re
 import logging
-from datetime import datetime, timedelta
-from typing import Dict, Any, Tuple
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+from typing import Dict, Any, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
-time_patterns = {
-    "today": lambda: get_today_range(),
-    "tomorrow": lambda: get_tomorrow_range(),
-    "yesterday": lambda: get_yesterday_range(),
-    "this_week": lambda: get_this_week_range(),
-    "last_hours": lambda h: get_last_hours_range(h),
+# Leading words that settle the intent without scanning the rest of the message
+FIRST_TOKEN_INTENTS = {
+    "task": "task_query",
+    "tasks": "task_query",
+    "activity": "activity_query",
+    "activities": "activity_query",
+}
+
+TASKS_PATTERN = re.compile(r"\btasks?\b", re.IGNORECASE)
+ACTIVITY_PATTERN = re.compile(
+    r"\bactivit(y|ies)\b|\bupcoming\b|\bscheduled\b", re.IGNORECASE
+)
+LAST_HOURS_PATTERN = re.compile(r"last (\d+) hours?", re.IGNORECASE)
+TIME_KEYWORD_PATTERNS = (
+    ("today", re.compile(r"\btoday\b", re.IGNORECASE)),
+    ("tomorrow", re.compile(r"\btomorrow\b", re.IGNORECASE)),
+    ("yesterday", re.compile(r"\byesterday\b", re.IGNORECASE)),
+    ("this_week", re.compile(r"\bthis week\b", re.IGNORECASE)),
+)
+
+STATUS_MAP = {
+    "overdue": "Overdue",
+    "pending": "Pending",
+    "completed": "Completed",
+}
+STATUS_PATTERN = re.compile(r"\b(overdue|pending|completed)\b", re.IGNORECASE)
+
+PRIORITY_MAP = {
+    "high": "High",
+    "medium": "Medium",
+    "low": "Low",
+}
+PRIORITY_PATTERN = re.compile(r"\b(high|medium|low) priority\b", re.IGNORECASE)
+
+CATEGORY_MAP = {
+    "medication": "Medication",
+    "exercise": "Exercise",
+    "social": "Social",
+    "entertainment": "Entertainment",
+    "education": "Education",
 }
+CATEGORY_PATTERN = re.compile(
+    r"\b(medication|exercise|social|entertainment|education)\b", re.IGNORECASE
+)
+# Bounded so a long message can't drag the capture to its end
+LOCATION_PATTERN = re.compile(r"\bin\s+([A-Za-z][A-Za-z\s]{0,40})", re.IGNORECASE)
+
+RESIDENT_NAME_PATTERNS = tuple(
+    re.compile(pattern, re.IGNORECASE)
+    for pattern in (
+        r"how\s+is\s+([A-Za-z\s]+?)(?:\s+doing)?(?:\s|$)",
+        r"what\s+happened\s+to\s+([A-Za-z\s]+?)(?:\s+today|\s+yesterday|\s+this\s+week)?(?:\s|$)",
+        r"(?:resident|patient)?\s+([A-Za-z\s]+?)(?:\s+info|information|details|profile|status)?(?:\s|$)",
+        r"tell\s+me\s+about\s+([A-Za-z\s]+?)(?:\s|$)",
+        r"show\s+(?:me\s+)?(?:resident|patient)?\s+([A-Za-z\s]+?)(?:\s|$)",
+        r"(?:find|look\s+up|search\s+for)\s+(?:resident|patient)?\s+([A-Za-z\s]+?)(?:\s|$)",
+    )
+)
+RESIDENT_INDICATORS = (
+    "resident",
+    "patient",
+    "how is",
+    "tell me about",
+    "profile",
+    "details",
+    "information",
+    "status",
+    "what happened to",
+    "show resident",
+)
+# Substring match on any indicator, in a single scan of the message
+RESIDENT_INDICATOR_PATTERN = re.compile(
+    "|".join(re.escape(indicator) for indicator in RESIDENT_INDICATORS)
+)
 
 
 def parse_query(message_text: str) -> Tuple[str, Dict[str, Any]]:
+    """Classify a message; expects text already stripped and lowercased"""
     try:
-        intent = "general_question"
-        time_range = {}
-        filters = {}
-
-        message_text = message_text.lower().strip()
-
-        if "today" in message_text and (
-            "task" in message_text or "tasks" in message_text
-        ):
-            intent = "task_query"
-            time_range = get_today_range()
-            logger.info(
-                f"Detected 'today's tasks' query, using time range: {time_range}"
-            )
-            return intent, {"time_range": time_range, "filters": filters}
-
-        if re.search(r"\btasks?\b", message_text, re.IGNORECASE):
-            intent = "task_query"
-            time_range = extract_time_range(message_text)
-            filters.update(extract_task_filters(message_text))
-
-        elif re.search(
-            r"\bactivit(y|ies)\b|\bupcoming\b|\bscheduled\b",
-            message_text,
-            re.IGNORECASE,
-        ):
-            intent = "activity_query"
-            time_range = extract_time_range(message_text)
-            filters.update(extract_activity_filters(message_text))
-
-        elif is_resident_query(message_text):
-            intent = "resident_query"
-            time_range = extract_time_range(message_text)
-            filters["resident_name"] = extract_resident_name(message_text)
-
-        return intent, {"time_range": time_range, "filters": filters}
+        intent, filters, time_keyword = classify_query(message_text)
+        return intent, {
+            "time_range": resolve_time_range(time_keyword),
+            "time_keyword": time_keyword,
+            "filters": dict(filters),
+        }
 
     except Exception as e:
         logger.error(f"Error parsing query: {str(e)}")
-        return "general_question", {"time_range": {}, "filters": {}}
+        return "general_question", {
+            "time_range": {},
+            "time_keyword": None,
+            "filters": {},
+        }
+
+
+@lru_cache(maxsize=2048)
+def classify_query(
+    message_text: str,
+) -> Tuple[str, Tuple[Tuple[str, Any], ...], Optional[Tuple]]:
+    """Intent, filter items and time keyword for a message
+
+    Only depends on the text, so results are cached; the time keyword is
+    resolved to concrete datetimes by the caller on every message.
+    """
+    intent = "general_question"
+    time_keyword = None
+    filters = {}
+
+    if "today" in message_text and ("task" in message_text or "tasks" in message_text):
+        logger.info("Detected 'today's tasks' query")
+        return "task_query", (), ("today",)
+
+    first_token_intent = FIRST_TOKEN_INTENTS.get(message_text.split(" ", 1)[0])
+
+    if first_token_intent == "task_query" or TASKS_PATTERN.search(message_text):
+        intent = "task_query"
+        time_keyword = find_time_keyword(message_text)
+        filters.update(extract_task_filters(message_text))
+
+    elif first_token_intent == "activity_query" or ACTIVITY_PATTERN.search(
+        message_text
+    ):
+        intent = "activity_query"
+        time_keyword = find_time_keyword(message_text)
+        filters.update(extract_activity_filters(message_text))
+
+    elif is_resident_query(message_text):
+        intent = "resident_query"
+        time_keyword = find_time_keyword(message_text)
+        filters["resident_name"] = extract_resident_name(message_text)
+
+    return intent, tuple(filters.items()), time_keyword
+
+
+def find_time_keyword(text: str) -> Optional[Tuple]:
+    """Time keyword and its arguments, e.g. ("today",) or ("last_hours", 3)"""
+    for keyword, pattern in TIME_KEYWORD_PATTERNS:
+        if pattern.search(text):
+            return (keyword,)
 
+    match = LAST_HOURS_PATTERN.search(text)
+    if match:
+        return "last_hours", int(match.group(1))
+    return None
 
-def extract_time_range(text: str) -> Dict[str, datetime]:
-    for pattern, handler in time_patterns.items():
-        if pattern == "last_hours":
-            match = re.search(r"last (\d+) hours?", text, re.IGNORECASE)
-            if match:
-                hours = int(match.group(1))
-                return handler(hours)
-        elif re.search(rf'\b{pattern.replace("_", " ")}\b', text, re.IGNORECASE):
-            return handler()
-    return {}
+
+def resolve_time_range(time_keyword: Optional[Tuple]) -> Dict[str, datetime]:
+    if not time_keyword:
+        return {}
+    keyword, *args = time_keyword
+    return time_patterns[keyword](*args)
 
 
 def extract_task_filters(text: str) -> Dict[str, Any]:
     filters = {}
 
-    status_map = {
-        "overdue": "Overdue",
-        "pending": "Pending",
-        "completed": "Completed",
-    }
-    for status, value in status_map.items():
-        if re.search(rf"\b{status}\b", text, re.IGNORECASE):
-            filters["status"] = value
-            break
-
-    priority_map = {
-        "high priority": "High",
-        "medium priority": "Medium",
-        "low priority": "Low",
-    }
-    for priority, value in priority_map.items():
-        if re.search(rf"\b{priority}\b", text, re.IGNORECASE):
-            filters["priority"] = value
-            break
+    status_match = STATUS_PATTERN.search(text)
+    if status_match:
+        filters["status"] = STATUS_MAP[status_match.group(1).lower()]
+
+    priority_match = PRIORITY_PATTERN.search(text)
+    if priority_match:
+        filters["priority"] = PRIORITY_MAP[priority_match.group(1).lower()]
 
     return filters
 
@@ -99,73 +176,39 @@ def extract_task_filters(text: str) -> Dict[str, Any]:
 def extract_activity_filters(text: str) -> Dict[str, Any]:
     filters = {}
 
-    location_match = re.search(
-        r"in\s+([A-Za-z\s]+)(room|hall|area)?", text, re.IGNORECASE
-    )
+    location_match = LOCATION_PATTERN.search(text)
     if location_match:
         filters["location"] = location_match.group(1).strip()
 
-    categories = ["Medication", "Exercise", "Social", "Entertainment", "Education"]
-    for category in categories:
-        if re.search(rf"\b{category}\b", text, re.IGNORECASE):
-            filters["category"] = category
-            break
+    category_match = CATEGORY_PATTERN.search(text)
+    if category_match:
+        filters["category"] = CATEGORY_MAP[category_match.group(1).lower()]
 
     return filters
 
 
 def extract_resident_name(text: str) -> str:
-    text = text.lower().strip()
-
-    direct_patterns = [
-        r"how\s+is\s+([A-Za-z\s]+?)(?:\s+doing)?(?:\s|$)",
-        r"what\s+happened\s+to\s+([A-Za-z\s]+?)(?:\s+today|\s+yesterday|\s+this\s+week)?(?:\s|$)",
-        r"(?:resident|patient)?\s+([A-Za-z\s]+?)(?:\s+info|information|details|profile|status)?(?:\s|$)",
-        r"tell\s+me\s+about\s+([A-Za-z\s]+?)(?:\s|$)",
-        r"show\s+(?:me\s+)?(?:resident|patient)?\s+([A-Za-z\s]+?)(?:\s|$)",
-        r"(?:find|look\s+up|search\s+for)\s+(?:resident|patient)?\s+([A-Za-z\s]+?)(?:\s|$)",
-    ]
-
-    for pattern in direct_patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
+    """Pull a resident name out of stripped, lowercased message text"""
+    for pattern in RESIDENT_NAME_PATTERNS:
+        match = pattern.search(text)
         if match:
             name = match.group(1).strip()
-            logger.info(f"Extracted resident name from direct pattern: '{name}'")
+            logger.info("Extracted resident name from direct pattern: '%s'", name)
             return name
 
     words = text.split()
     if 1 <= len(words) <= 3:
         potential_name = " ".join(words)
-        logger.info(f"Potential resident name from simple text: '{potential_name}'")
+        logger.info("Potential resident name from simple text: '%s'", potential_name)
         return potential_name
 
-    name_match = re.search(r"([A-Z][a-z]+(?:\s+[A-Z][a-z]+){0,2})", text)
-    if name_match:
-        name = name_match.group(1).strip()
-        logger.info(f"Extracted resident name from capitalization: '{name}'")
-        return name
-
-    logger.info(f"No resident name found in: '{text}'")
+    logger.info("No resident name found in: '%s'", text)
     return ""
 
 
 def is_resident_query(text: str) -> bool:
-    text = text.lower().strip()
-
-    resident_indicators = [
-        "resident",
-        "patient",
-        "how is",
-        "tell me about",
-        "profile",
-        "details",
-        "information",
-        "status",
-        "what happened to",
-        "show resident",
-    ]
-
-    if any(indicator in text for indicator in resident_indicators):
+    """Whether stripped, lowercased message text asks about a resident"""
+    if RESIDENT_INDICATOR_PATTERN.search(text):
         return True
 
     words = text.split()
@@ -175,34 +218,31 @@ def is_resident_query(text: str) -> bool:
     return False
 
 
+@lru_cache(maxsize=8)
+def get_day_bounds(day: date) -> Tuple[datetime, datetime]:
+    """First and last instant of a calendar day, memoized per date"""
+    return datetime.combine(day, time.min), datetime.combine(day, time.max)
+
+
 def get_today_range() -> Dict[str, datetime]:
-    now = datetime.now()
-    today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-    today_end = now.replace(hour=23, minute=59, second=59, microsecond=999999)
-    logger.info(f"Generated today's range: {today_start} to {today_end}")
+    today_start, today_end = get_day_bounds(date.today())
+    logger.info("Generated today's range: %s to %s", today_start, today_end)
     return {"start_time": today_start, "end_time": today_end}
 
 
 def get_tomorrow_range() -> Dict[str, datetime]:
-    now = datetime.now()
-    tomorrow = now + timedelta(days=1)
-    tomorrow_start = tomorrow.replace(hour=0, minute=0, second=0, microsecond=0)
-    tomorrow_end = tomorrow.replace(hour=23, minute=59, second=59, microsecond=999999)
+    tomorrow_start, tomorrow_end = get_day_bounds(date.today() + timedelta(days=1))
     return {"start_time": tomorrow_start, "end_time": tomorrow_end}
 
 
 def get_yesterday_range() -> Dict[str, datetime]:
-    now = datetime.now()
-    yesterday = now - timedelta(days=1)
-    yesterday_start = yesterday.replace(hour=0, minute=0, second=0, microsecond=0)
-    yesterday_end = yesterday.replace(hour=23, minute=59, second=59, microsecond=999999)
+    yesterday_start, yesterday_end = get_day_bounds(date.today() - timedelta(days=1))
     return {"start_time": yesterday_start, "end_time": yesterday_end}
 
 
 def get_this_week_range() -> Dict[str, datetime]:
     now = datetime.now()
-    start_of_week = now - timedelta(days=now.weekday())
-    start_of_week = start_of_week.replace(hour=0, minute=0, second=0, microsecond=0)
+    start_of_week, _ = get_day_bounds(now.date() - timedelta(days=now.weekday()))
     end_of_week = now
     return {"start_time": start_of_week, "end_time": end_of_week}
 
@@ -211,3 +251,13 @@ def get_last_hours_range(hours: int) -> Dict[str, datetime]:
     now = datetime.now()
     hours_ago = now - timedelta(hours=hours)
     return {"start_time": hours_ago, "end_time": now}
+
+
+# Time keyword -> range builder, used to resolve classified time keywords
+time_patterns = {
+    "today": get_today_range,
+    "tomorrow": get_tomorrow_range,
+    "yesterday": get_yesterday_range,
+    "this_week": get_this_week_range,
+    "last_hours": get_last_hours_range,
+}
@@ -1,8 +1,8 @@
 import logging
+from functools import lru_cache
 from typing import List, Dict, Any
 from datetime import datetime
 
-
 logger = logging.getLogger(__name__)
 
 MAX_MESSAGE_LENGTH = 4000
@@ -14,14 +14,39 @@ RESPONSE_TEMPLATES = {
     "resident_not_found": "Sorry, I couldn't find a resident with that name.",
 }
 
-
-def format_task_response(tasks: List[Dict[str, Any]]) -> str:
+# Early-return responses for the formatters' empty-result paths
+NO_RESULTS_RESPONSE = RESPONSE_TEMPLATES["no_results"]
+RESIDENT_NOT_FOUND_RESPONSE = RESPONSE_TEMPLATES["resident_not_found"]
+
+TASK_ROW_TEMPLATE = (
+    "%d. *%s*\n"
+    "   Status: %s | Priority: %s\n"
+    "   For: %s | By: %s\n"
+    "   Time: %s\n\n"
+)
+ACTIVITY_ROW_TEMPLATE = (
+    "%d. *%s*\n"
+    "   Category: %s | Location: %s\n"
+    "   Created by: %s\n"
+    "   Time: %s\n\n"
+)
+RESIDENT_TASK_ROW_TEMPLATE = (
+    "%d. *%s*\n   Status: %s | Assigned to: %s\n   Time: %s\n\n"
+)
+
+
+def format_task_response(tasks: List[Dict[str, Any]]) -> List[str]:
+    """Response parts, one per task, for send_chunked to pack into messages"""
     if not tasks:
-        return RESPONSE_TEMPLATES["no_results"]
+        return [NO_RESULTS_RESPONSE]
 
-    response = f"📋 *Found {len(tasks)} tasks:*\n\n"
+    n = len(tasks)
+    head = tasks[:10]
+    parts = [f"📋 *Found {n} tasks:*\n\n"]
+    fmt = format_datetime
+    append = parts.append
 
-    for idx, task in enumerate(tasks[:10], start=1):
+    for idx, task in enumerate(head, start=1):
         title = task.get("task_title", "Untitled Task")
         status = task.get("status", "Unknown")
         priority = task.get("priority", "")
@@ -31,32 +56,33 @@ def format_task_response(tasks: List[Dict[str, Any]]) -> str:
         start_date = task.get("start_date")
         due_date = task.get("due_date")
 
-        date_str = ""
-        if start_date:
-            date_str = f"{format_datetime(start_date)}"
+        date_str = fmt(start_date) if start_date else ""
         if due_date:
-            date_str += f" to {format_datetime(due_date)}"
+            date_str = f"{date_str} to {fmt(due_date)}"
 
-        response += (
-            f"{idx}. *{title}*\n"
-            f"   Status: {status} | Priority: {priority}\n"
-            f"   For: {assigned_for} | By: {assigned_to}\n"
-            f"   Time: {date_str}\n\n"
+        append(
+            TASK_ROW_TEMPLATE
+            % (idx, title, status, priority, assigned_for, assigned_to, date_str)
         )
 
-    if len(tasks) > 10:
-        response += f"...and {len(tasks) - 10} more tasks (showing first 10 only)."
+    if n > 10:
+        parts.append(f"...and {n - 10} more tasks (showing first 10 only).")
 
-    return truncate_response(response)
+    return parts
 
 
-def format_activity_response(activities: List[Dict[str, Any]]) -> str:
+def format_activity_response(activities: List[Dict[str, Any]]) -> List[str]:
+    """Response parts, one per activity, for send_chunked to pack into messages"""
     if not activities:
-        return RESPONSE_TEMPLATES["no_results"]
+        return [NO_RESULTS_RESPONSE]
 
-    response = f"🗓️ *Found {len(activities)} activities:*\n\n"
+    n = len(activities)
+    head = activities[:10]
+    parts = [f"🗓️ *Found {n} activities:*\n\n"]
+    fmt = format_datetime
+    append = parts.append
 
-    for idx, activity in enumerate(activities[:10], start=1):
+    for idx, activity in enumerate(head, start=1):
         title = activity.get("title", "Untitled Activity")
         location = activity.get("location", "No location")
         category = activity.get("category", "Uncategorized")
@@ -65,47 +91,42 @@ def format_activity_response(activities: List[Dict[str, Any]]) -> str:
         start_time = activity.get("start_time")
         end_time = activity.get("end_time")
 
-        time_str = ""
-        if start_time:
-            time_str = f"{format_datetime(start_time)}"
+        time_str = fmt(start_time) if start_time else ""
         if end_time:
-            time_str += f" to {format_datetime(end_time)}"
+            time_str = f"{time_str} to {fmt(end_time)}"
 
-        response += (
-            f"{idx}. *{title}*\n"
-            f"   Category: {category} | Location: {location}\n"
-            f"   Created by: {created_by}\n"
-            f"   Time: {time_str}\n\n"
+        append(
+            ACTIVITY_ROW_TEMPLATE
+            % (idx, title, category, location, created_by, time_str)
         )
 
-    if len(activities) > 10:
-        response += (
-            f"...and {len(activities) - 10} more activities (showing first 10 only)."
-        )
+    if n > 10:
+        parts.append(f"...and {n - 10} more activities (showing first 10 only).")
 
-    return truncate_response(response)
+    return parts
 
 
-def format_resident_response(resident, tasks, is_general_query=False) -> str:
+def format_resident_response(resident, tasks, is_general_query=False) -> List[str]:
+    """Response parts for a resident profile or list, for send_chunked"""
     if isinstance(resident, list):
         if not resident:
-            return RESPONSE_TEMPLATES["resident_not_found"]
+            return [RESIDENT_NOT_FOUND_RESPONSE]
 
-        response = f"👥 *Found {len(resident)} residents:*\n\n"
-        for idx, res in enumerate(resident[:10], start=1):
+        n = len(resident)
+        head = resident[:10]
+        parts = [f"👥 *Found {n} residents:*\n\n"]
+        for idx, res in enumerate(head, start=1):
             full_name = res.get("full_name", "Unknown")
             room_number = res.get("room_number", "Unknown")
-            response += f"{idx}. *{full_name}* (Room: {room_number})\n\n"
+            parts.append(f"{idx}. *{full_name}* (Room: {room_number})\n\n")
 
-        if len(resident) > 10:
-            response += (
-                f"...and {len(resident) - 10} more residents (showing first 10 only)."
-            )
+        if n > 10:
+            parts.append(f"...and {n - 10} more residents (showing first 10 only).")
 
-        return truncate_response(response)
+        return parts
 
     if not resident:
-        return RESPONSE_TEMPLATES["resident_not_found"]
+        return [RESIDENT_NOT_FOUND_RESPONSE]
 
     full_name = resident.get("full_name", "Unknown")
     room_number = resident.get("room_number", "Unknown")
@@ -114,62 +135,69 @@ def format_resident_response(resident, tasks, is_general_query=False) -> str:
     medications = resident.get("medications", [])
     notes = resident.get("notes", "")
 
-    response = f"👤 *Resident Profile: {full_name}*\n"
-    response += f"Room: {room_number}\n"
+    parts = [f"👤 *Resident Profile: {full_name}*\n", f"Room: {room_number}\n"]
 
     if medical_conditions:
-        response += f"Medical Conditions: {', '.join(medical_conditions)}\n"
+        parts.append(f"Medical Conditions: {', '.join(medical_conditions)}\n")
 
     if medications:
-        response += f"Medications: {', '.join(medications)}\n"
+        parts.append(f"Medications: {', '.join(medications)}\n")
 
     if notes:
-        response += f"Notes: {notes}\n"
+        parts.append(f"Notes: {notes}\n")
 
-    response += "\n"
+    if not tasks:
+        parts.append("\nNo recent tasks found for this resident.")
+        return parts
 
-    if tasks:
-        response += f"*Recent tasks for {full_name}:*\n\n"
+    parts.append(f"\n*Recent tasks for {full_name}:*\n\n")
 
-        for idx, task in enumerate(tasks[:5], start=1):
-            title = task.get("task_title", "Untitled Task")
-            status = task.get("status", "Unknown")
-            assigned_to = task.get("assigned_to_name", "Unassigned")
+    n = len(tasks)
+    head = tasks[:5]
+    fmt = format_datetime
+    append = parts.append
+    for idx, task in enumerate(head, start=1):
+        title = task.get("task_title", "Untitled Task")
+        status = task.get("status", "Unknown")
+        assigned_to = task.get("assigned_to_name", "Unassigned")
 
-            start_date = task.get("start_date")
-            date_str = format_datetime(start_date) if start_date else "Unknown"
+        start_date = task.get("start_date")
+        date_str = fmt(start_date) if start_date else "Unknown"
 
-            response += (
-                f"{idx}. *{title}*\n"
-                f"   Status: {status} | Assigned to: {assigned_to}\n"
-                f"   Time: {date_str}\n\n"
-            )
+        append(RESIDENT_TASK_ROW_TEMPLATE % (idx, title, status, assigned_to, date_str))
 
-        if len(tasks) > 5:
-            response += f"...and {len(tasks) - 5} more tasks (showing first 5 only)."
-    else:
-        response += "No recent tasks found for this resident."
+    if n > 5:
+        parts.append(f"...and {n - 5} more tasks (showing first 5 only).")
 
-    return truncate_response(response)
+    return parts
 
 
 def format_datetime(dt: datetime) -> str:
     if not dt:
         return "Unknown time"
     try:
-        return dt.strftime("%Y-%m-%d %H:%M")
+        return format_timestamp(dt, dt.tzinfo)
     except Exception as e:
         logger.error(f"Error formatting datetime {dt}: {str(e)}")
         return "Invalid time format"
 
 
+@lru_cache(maxsize=512)
+def format_timestamp(dt: datetime, tzinfo) -> str:
+    # tzinfo is part of the key: aware datetimes for the same instant in
+    # different zones compare equal but format differently
+    return dt.strftime("%Y-%m-%d %H:%M")
+
+
 def truncate_response(text: str) -> str:
     if len(text) <= MAX_MESSAGE_LENGTH:
         return text
 
-    truncated_text = text[: MAX_MESSAGE_LENGTH - 100]
-    last_newline = truncated_text.rfind("\n")
-    if last_newline > MAX_MESSAGE_LENGTH - 200:
-        truncated_text = truncated_text[:last_newline]
+    # Prefer cutting at a line break in the last 100 characters kept,
+    # searching only that window of the original text
+    cut = MAX_MESSAGE_LENGTH - 100
+    last_newline = text.rfind("\n", MAX_MESSAGE_LENGTH - 199, cut)
+    if last_newline != -1:
+        cut = last_newline
 
-    return truncated_text + "\n\n...(message truncated due to length)"
+    return text[:cut] + "\n\n...(message truncated due to length)"
@@ -1,10 +1,7 @@
-import os
 import logging
-import os
-import uuid
-import wave
 import asyncio
-import ffmpeg
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from bson import ObjectId
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
@@ -19,23 +16,62 @@ from telegram.ext import (
     filters,
     CallbackQueryHandler,
 )
-from utils.config import ASSISTANT_BOT_TOKEN, speech_config, ffmpeg_path
+from telegram.request import HTTPXRequest
+from utils.config import (
+    ASSISTANT_BOT_TOKEN,
+    ASSISTANT_BOT_WEBHOOK_URL,
+    ASSISTANT_BOT_WEBHOOK_PORT,
+    WEBHOOK_SECRET_TOKEN,
+    SSL_CONTEXT,
+    speech_config,
+    ffmpeg_path,
+)
 import azure.cognitiveservices.speech as speechsdk
-from .services.ai_service import summarize_text
+from .services.ai_service import stream_summary
 from .handlers.message_handler import (
     handle_message,
     list_all_residents,
     handle_task_query,
     handle_resident_query,
     init_handler,
+    get_reply_target,
 )
-from auth.user_auth import restricted
+from auth.user_auth import restricted, get_user_by_telegram_handle
 from assistant_bot.db.connection import (
     db_service,
-    users_collection,
     resident_collection,
 )
 
+# Raw audio layout produced by the ffmpeg decode and expected by Azure
+PCM_STREAM_FORMAT = speechsdk.audio.AudioStreamFormat(
+    samples_per_second=16000, bits_per_sample=16, channels=1
+)
+PCM_BYTES_PER_SECOND = 16000 * 2
+# 100 ms of audio per push, so recognition starts before the whole clip is sent
+PCM_CHUNK_BYTES = PCM_BYTES_PER_SECOND // 10
+RECOGNITION_TIMEOUT_SECONDS = 15
+PREWARMED_RECOGNIZER_COUNT = 2
+# Telegram rate-limits edits to roughly one per second per chat
+SUMMARY_EDIT_INTERVAL_SECONDS = 1.0
+
+# OGG on stdin to raw PCM in PCM_STREAM_FORMAT; download_voice_pcm adds the
+# resampler and the stdout output
+FFMPEG_DECODE_ARGS = (
+    ffmpeg_path,
+    "-v",
+    "error",
+    "-f",
+    "ogg",
+    "-i",
+    "pipe:0",
+    "-f",
+    "s16le",
+    "-ac",
+    "1",
+    "-ar",
+    "16000",
+)
+
 logging.basicConfig(
     format="%(asctime)s - %(levelname)s - %(message)s", level=logging.INFO
 )
@@ -43,39 +79,113 @@ logger = logging.getLogger(__name__)
 
 SELECTING_RESIDENT, RECORDING_NOTE, CONFIRMING_NOTE = range(3)
 
+HELP_TEXT = (
+    "🤖 *CareConnect Bot Help* 🤖\n\n"
+    "*Available Commands:*\n"
+    "/start - Start the bot\n"
+    "/help - Show this help message\n"
+    "/residents - List all residents\n"
+    "/tasks - List today's tasks\n"
+    "/stats - Show quick statistics\n"
+    "/voicenote - Add a voice note for a resident\n"
+    "/whoami - Show your user information\n\n"
+    "*Voice Notes:*\n"
+    "• Use /voicenote to add a voice note for a specific resident\n"
+    "• You can also send a voice message directly to get a transcription\n\n"
+    "*Natural Language Queries:*\n"
+    "You can ask me about tasks, residents, and activities in natural language. For example:\n\n"
+    "*Tasks:*\n"
+    "• What tasks are due today?\n"
+    "• Show me all high priority tasks\n"
+    "• Any overdue tasks?\n"
+    "• List pending tasks for [nurse name]\n\n"
+    "*Residents:*\n"
+    "• How is [resident name] doing?\n"
+    "• What happened to [resident name] today?\n"
+    "• Show tasks for [resident name]\n"
+    "• List residents in [care level]\n\n"
+    "*Activities:*\n"
+    "• What activities are scheduled today?\n"
+    "• Show me activities for this week\n"
+    "• Any activities in [location]?\n\n"
+    "*Time Ranges:*\n"
+    "• last 3 hours\n"
+    "• yesterday\n"
+    "• this week\n"
+    "• tomorrow\n\n"
+    "*Follow-up Questions:*\n"
+    "You can ask follow-up questions like:\n"
+    "• What about tomorrow?\n"
+    "• And high priority tasks?\n"
+    "• Also show me activities"
+)
+
+CANCEL_BUTTON = InlineKeyboardButton("Cancel", callback_data="cancel")
+
+START_KEYBOARD = InlineKeyboardMarkup(
+    [
+        [
+            InlineKeyboardButton("List Residents", callback_data="list_residents"),
+            InlineKeyboardButton("Today's Tasks", callback_data="today_tasks"),
+        ],
+        [
+            InlineKeyboardButton("Add Voice Note", callback_data="voicenote"),
+            InlineKeyboardButton("Quick Stats", callback_data="quick_stats"),
+        ],
+        [
+            InlineKeyboardButton("Show Help", callback_data="show_help"),
+        ],
+    ]
+)
+
+STATS_KEYBOARD = InlineKeyboardMarkup(
+    [
+        [
+            InlineKeyboardButton("Show Today's Tasks", callback_data="today_tasks"),
+            InlineKeyboardButton("Show Overdue Tasks", callback_data="overdue_tasks"),
+        ]
+    ]
+)
+
 init_handler(db_service)
 
+# Recognizers whose Azure connection is already open, ready for the next clip
+prewarmed_recognizers = deque()
+# Blocking speech SDK calls get their own threads instead of the default pool
+speech_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="azure-stt")
+# Extra decode arguments, set by detect_ffmpeg_resampler() at startup
+ffmpeg_resample_args = ()
 
-async def get_today_date_range():
-    now = datetime.now()
+
+def get_today_date_range(now=None):
+    now = now or datetime.now()
     today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
     today_end = now.replace(hour=23, minute=59, second=59, microsecond=999999)
-    logger.info(f"Main today range: {today_start} to {today_end}")
+    logger.info("Main today range: %s to %s", today_start, today_end)
     return today_start, today_end
 
 
+# Start menu and stats buttons -> handler(update, context); the update's
+# message is the one carrying the pressed button
+CALLBACK_DISPATCH = {
+    "list_residents": lambda update, context: list_all_residents(update),
+    "today_tasks": lambda update, context: send_today_tasks(update),
+    "show_help": lambda update, context: get_reply_target(update).reply_text(
+        HELP_TEXT, parse_mode="Markdown"
+    ),
+    "voicenote": lambda update, context: voicenote_start(update, context),
+    "quick_stats": lambda update, context: send_stats(get_reply_target(update)),
+    "overdue_tasks": lambda update, context: send_overdue_tasks(update),
+    "resident_stats": lambda update, context: handle_resident_query(update, {}, {}),
+    "task_stats": lambda update, context: handle_task_query(update, {}, {}),
+}
+
+
 async def check_auth_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
     await query.answer()
 
-    username = update.effective_user.username
-    user = await users_collection.find_one({"telegram_handle": username})
-
-    if not user and username:
-        clean_username = username.lower().replace("@", "")
-        user = await users_collection.find_one({"telegram_handle": clean_username})
-
-        if not user:
-            user = await users_collection.find_one(
-                {
-                    "$expr": {
-                        "$eq": [
-                            {"$toLower": "$telegram_handle"},
-                            username.lower(),
-                        ]
-                    }
-                }
-            )
+    user = await get_user_by_telegram_handle(update.effective_user.username)
 
     if not user:
         await query.message.reply_text(
@@ -89,116 +199,9 @@ async def check_auth_callback(update: Update, context: ContextTypes.DEFAULT_TYPE
 
     new_update = Update(update.update_id, message=query.message, callback_query=query)
 
-    if query.data == "list_residents":
-        await list_all_residents(new_update)
-    elif query.data == "today_tasks":
-        today_start, today_end = await get_today_date_range()
-        await handle_task_query(
-            new_update, {"start_time": today_start, "end_time": today_end}, {}
-        )
-    elif query.data == "show_help":
-        help_text = (
-            "🤖 *CareConnect Bot Help* 🤖\n\n"
-            "*Available Commands:*\n"
-            "/start - Start the bot\n"
-            "/help - Show this help message\n"
-            "/residents - List all residents\n"
-            "/tasks - List today's tasks\n"
-            "/stats - Show quick statistics\n"
-            "/voicenote - Add a voice note for a resident\n"
-            "/whoami - Show your user information\n\n"
-            "*Voice Notes:*\n"
-            "• Use /voicenote to add a voice note for a specific resident\n"
-            "• You can also send a voice message directly to get a transcription\n\n"
-            "*Natural Language Queries:*\n"
-            "You can ask me about tasks, residents, and activities in natural language. For example:\n\n"
-            "*Tasks:*\n"
-            "• What tasks are due today?\n"
-            "• Show me all high priority tasks\n"
-            "• Any overdue tasks?\n"
-            "• List pending tasks for [nurse name]\n\n"
-            "*Residents:*\n"
-            "• How is [resident name] doing?\n"
-            "• What happened to [resident name] today?\n"
-            "• Show tasks for [resident name]\n"
-            "• List residents in [care level]\n\n"
-            "*Activities:*\n"
-            "• What activities are scheduled today?\n"
-            "• Show me activities for this week\n"
-            "• Any activities in [location]?\n\n"
-            "*Time Ranges:*\n"
-            "• last 3 hours\n"
-            "• yesterday\n"
-            "• this week\n"
-            "• tomorrow\n\n"
-            "*Follow-up Questions:*\n"
-            "You can ask follow-up questions like:\n"
-            "• What about tomorrow?\n"
-            "• And high priority tasks?\n"
-            "• Also show me activities"
-        )
-        await query.message.reply_text(help_text, parse_mode="Markdown")
-    elif query.data == "voicenote":
-        await voicenote_start(new_update, context)
-    elif query.data == "quick_stats":
-        try:
-            total_residents = await resident_collection.count_documents({})
-
-            today_start, today_end = await get_today_date_range()
-            today_tasks = await db_service.task_collection.count_documents(
-                {
-                    "$or": [
-                        {"start_date": {"$gte": today_start, "$lte": today_end}},
-                        {
-                            "recurring": True,
-                            "recurring_days": {"$in": [today_start.weekday()]},
-                        },
-                    ]
-                }
-            )
-
-            now = datetime.now()
-            overdue_tasks = await db_service.task_collection.count_documents(
-                {"status": "pending", "due_date": {"$lt": now}}
-            )
-
-            stats_text = (
-                "📊 *Quick Statistics*\n\n"
-                f"• Total Residents: {total_residents}\n"
-                f"• Today's Tasks: {today_tasks}\n"
-                f"• Overdue Tasks: {overdue_tasks}\n\n"
-                "Use the buttons below for more details:"
-            )
-
-            keyboard = [
-                [
-                    InlineKeyboardButton(
-                        "Show Today's Tasks", callback_data="today_tasks"
-                    ),
-                    InlineKeyboardButton(
-                        "Show Overdue Tasks", callback_data="overdue_tasks"
-                    ),
-                ]
-            ]
-            reply_markup = InlineKeyboardMarkup(keyboard)
-
-            await query.message.reply_text(
-                stats_text, parse_mode="Markdown", reply_markup=reply_markup
-            )
-        except Exception as e:
-            logger.error(f"Error showing stats: {str(e)}")
-            await query.message.reply_text(
-                "Sorry, I couldn't fetch the statistics right now."
-            )
-    elif query.data == "overdue_tasks":
-        now = datetime.now()
-        await handle_task_query(
-            new_update, {}, {"status": "pending", "due_date": {"$lt": now}}
-        )
-    elif query.data == "resident_stats":
-        await handle_resident_query(new_update, {}, {})
-    elif query.data == "task_stats":
-        await handle_task_query(new_update, {}, {})
+    handler = CALLBACK_DISPATCH.get(query.data)
+    if handler:
+        await handler(new_update, context)
 
 
 async def unknown(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -211,74 +214,19 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_name = context.user_data.get("name", user.first_name)
     logger.info(f"User {user.id} started the assistant bot")
 
-    keyboard = [
-        [
-            InlineKeyboardButton("List Residents", callback_data="list_residents"),
-            InlineKeyboardButton("Today's Tasks", callback_data="today_tasks"),
-        ],
-        [
-            InlineKeyboardButton("Add Voice Note", callback_data="voicenote"),
-            InlineKeyboardButton("Quick Stats", callback_data="quick_stats"),
-        ],
-        [
-            InlineKeyboardButton("Show Help", callback_data="show_help"),
-        ],
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-
     welcome_text = (
         f"Welcome to CareConnect Assistant Bot, {user_name}! 🤖\n\n"
         "I can help you manage and query information about residents, tasks, and activities.\n\n"
         "Try these quick actions or type /help for more information:"
     )
 
-    await update.message.reply_text(welcome_text, reply_markup=reply_markup)
+    await update.message.reply_text(welcome_text, reply_markup=START_KEYBOARD)
 
 
 @restricted
 async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    help_text = (
-        "🤖 *CareConnect Bot Help* 🤖\n\n"
-        "*Available Commands:*\n"
-        "/start - Start the bot\n"
-        "/help - Show this help message\n"
-        "/residents - List all residents\n"
-        "/tasks - List today's tasks\n"
-        "/stats - Show quick statistics\n"
-        "/voicenote - Add a voice note for a resident\n"
-        "/whoami - Show your user information\n\n"
-        "*Voice Notes:*\n"
-        "• Use /voicenote to add a voice note for a specific resident\n"
-        "• You can also send a voice message directly to get a transcription\n\n"
-        "*Natural Language Queries:*\n"
-        "You can ask me about tasks, residents, and activities in natural language. For example:\n\n"
-        "*Tasks:*\n"
-        "• What tasks are due today?\n"
-        "• Show me all high priority tasks\n"
-        "• Any overdue tasks?\n"
-        "• List pending tasks for [nurse name]\n\n"
-        "*Residents:*\n"
-        "• How is [resident name] doing?\n"
-        "• What happened to [resident name] today?\n"
-        "• Show tasks for [resident name]\n"
-        "• List residents in [care level]\n\n"
-        "*Activities:*\n"
-        "• What activities are scheduled today?\n"
-        "• Show me activities for this week\n"
-        "• Any activities in [location]?\n\n"
-        "*Time Ranges:*\n"
-        "• last 3 hours\n"
-        "• yesterday\n"
-        "• this week\n"
-        "• tomorrow\n\n"
-        "*Follow-up Questions:*\n"
-        "You can ask follow-up questions like:\n"
-        "• What about tomorrow?\n"
-        "• And high priority tasks?\n"
-        "• Also show me activities"
-    )
-    message = update.callback_query.message if update.callback_query else update.message
-    await message.reply_text(help_text, parse_mode="Markdown")
+    message = get_reply_target(update)
+    await message.reply_text(HELP_TEXT, parse_mode="Markdown")
 
 
 @restricted
@@ -312,15 +260,21 @@ async def resident_selected(update: Update, context: ContextTypes.DEFAULT_TYPE):
     resident_id = query.data.replace("resident_", "")
     context.user_data["current_resident_id"] = resident_id
 
-    resident = await resident_collection.find_one({"_id": ObjectId(resident_id)})
-    if not resident:
-        await query.message.edit_text("Error: Resident not found.")
-        return ConversationHandler.END
+    # Names were fetched with the selection keyboard, so no second lookup
+    resident_name = context.user_data.get("resident_index", {}).get(resident_id)
+    if resident_name is None:
+        resident = await resident_collection.find_one(
+            {"_id": ObjectId(resident_id)}, {"full_name": 1}
+        )
+        if not resident:
+            await query.message.edit_text("Error: Resident not found.")
+            return ConversationHandler.END
+        resident_name = resident.get("full_name")
 
-    context.user_data["resident_name"] = resident.get("full_name", "Unknown")
+    context.user_data["resident_name"] = resident_name or "Unknown"
 
     await query.message.edit_text(
-        f"Selected: {resident.get('full_name')}\n\nPlease send a voice message for your note."
+        f"Selected: {resident_name}\n\nPlease send a voice message for your note."
     )
 
     return RECORDING_NOTE
@@ -329,33 +283,53 @@ async def resident_selected(update: Update, context: ContextTypes.DEFAULT_TYPE):
 @restricted
 async def list_tasks(update: Update, context: ContextTypes.DEFAULT_TYPE):
     logger.info(f"User {update.effective_user.id} requested today's tasks")
-    today_start, today_end = await get_today_date_range()
+    await send_today_tasks(update)
+
+
+@restricted
+async def show_stats(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    await send_stats(get_reply_target(update))
+
+
+async def send_today_tasks(update: Update):
+    today_start, today_end = get_today_date_range()
     await handle_task_query(
         update, {"start_time": today_start, "end_time": today_end}, {}
     )
 
 
-@restricted
-async def show_stats(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    try:
-        total_residents = await resident_collection.count_documents({})
-
-        today_start, today_end = await get_today_date_range()
-        today_tasks = await db_service.task_collection.count_documents(
-            {
-                "$or": [
-                    {"start_date": {"$gte": today_start, "$lte": today_end}},
-                    {
-                        "recurring": True,
-                        "recurring_days": {"$in": [today_start.weekday()]},
-                    },
-                ]
-            }
-        )
+async def send_overdue_tasks(update: Update):
+    now = datetime.now()
+    await handle_task_query(update, {}, {"status": "pending", "due_date": {"$lt": now}})
+
 
+async def send_stats(message):
+    """Reply with resident and task counts, plus buttons to drill into the tasks"""
+    try:
+        # One clock reading, so today's range and "overdue" agree with each other
         now = datetime.now()
-        overdue_tasks = await db_service.task_collection.count_documents(
-            {"status": "pending", "due_date": {"$lt": now}}
+        today_start, today_end = get_today_date_range(now)
+        weekday = today_start.weekday()
+
+        # Independent counts, so they share one round trip's worth of latency
+        total_residents, today_tasks, overdue_tasks = await asyncio.gather(
+            # Read from collection metadata rather than counted; an estimate is
+            # fine for a headline figure
+            resident_collection.estimated_document_count(),
+            db_service.task_collection.count_documents(
+                {
+                    "$or": [
+                        {"start_date": {"$gte": today_start, "$lte": today_end}},
+                        {
+                            "recurring": True,
+                            "recurring_days": {"$in": [weekday]},
+                        },
+                    ]
+                }
+            ),
+            db_service.task_collection.count_documents(
+                {"status": "pending", "due_date": {"$lt": now}}
+            ),
         )
 
         stats_text = (
@@ -366,30 +340,197 @@ async def show_stats(update: Update, context: ContextTypes.DEFAULT_TYPE):
             "Use the buttons below for more details:"
         )
 
-        keyboard = [
-            [
-                InlineKeyboardButton("Show Today's Tasks", callback_data="today_tasks"),
-                InlineKeyboardButton(
-                    "Show Overdue Tasks", callback_data="overdue_tasks"
-                ),
-            ]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-
-        message = (
-            update.callback_query.message if update.callback_query else update.message
-        )
         await message.reply_text(
-            stats_text, parse_mode="Markdown", reply_markup=reply_markup
+            stats_text, parse_mode="Markdown", reply_markup=STATS_KEYBOARD
         )
     except Exception as e:
         logger.error(f"Error showing stats: {str(e)}")
-        message = (
-            update.callback_query.message if update.callback_query else update.message
-        )
         await message.reply_text("Sorry, I couldn't fetch the statistics right now.")
 
 
+def open_recognizer():
+    """Recognizer on a fresh push stream, with its service connection opening"""
+    push_stream = speechsdk.audio.PushAudioInputStream(stream_format=PCM_STREAM_FORMAT)
+    recognizer = speechsdk.SpeechRecognizer(
+        speech_config=speech_config,
+        audio_config=speechsdk.audio.AudioConfig(stream=push_stream),
+    )
+    # Opening is asynchronous, so the handshake overlaps whatever runs next
+    connection = speechsdk.Connection.from_recognizer(recognizer)
+    connection.open(True)
+    return push_stream, recognizer, connection
+
+
+def close_recognizer(speech_recognizer):
+    """Close a recognizer's service connection once it is no longer needed"""
+    _, _, connection = speech_recognizer
+    try:
+        connection.close()
+    except Exception as e:
+        logger.error(f"Error closing speech connection: {str(e)}")
+
+
+def fill_recognizer_pool():
+    while len(prewarmed_recognizers) < PREWARMED_RECOGNIZER_COUNT:
+        prewarmed_recognizers.append(open_recognizer())
+
+
+def take_recognizer():
+    """Take a pre-warmed recognizer and start warming its replacement"""
+    if prewarmed_recognizers:
+        recognizer = prewarmed_recognizers.popleft()
+    else:
+        recognizer = open_recognizer()
+    fill_recognizer_pool()
+    return recognizer
+
+
+async def transcribe_pcm(pcm: bytes, speech_recognizer) -> str:
+    """Transcribe 16 kHz mono 16-bit PCM with continuous recognition
+
+    speech_recognizer is a tuple from take_recognizer(); it is closed here once
+    recognition ends, whether or not it succeeds.
+    """
+    loop = asyncio.get_running_loop()
+    session_done = asyncio.Event()
+    utterances = []
+
+    push_stream, recognizer, _ = speech_recognizer
+
+    def on_recognized(evt):
+        if evt.result.reason == speechsdk.ResultReason.RecognizedSpeech:
+            utterances.append(evt.result.text)
+
+    def on_session_done(evt):
+        loop.call_soon_threadsafe(session_done.set)
+
+    recognizer.recognized.connect(on_recognized)
+    recognizer.session_stopped.connect(on_session_done)
+    recognizer.canceled.connect(on_session_done)
+
+    try:
+        await loop.run_in_executor(
+            speech_executor,
+            lambda: recognizer.start_continuous_recognition_async().get(),
+        )
+        try:
+            for start in range(0, len(pcm), PCM_CHUNK_BYTES):
+                push_stream.write(pcm[start : start + PCM_CHUNK_BYTES])
+            push_stream.close()
+
+            # Allow for the clip's own length plus service latency
+            timeout = len(pcm) / PCM_BYTES_PER_SECOND + RECOGNITION_TIMEOUT_SECONDS
+            await asyncio.wait_for(session_done.wait(), timeout=timeout)
+        finally:
+            await loop.run_in_executor(
+                speech_executor,
+                lambda: recognizer.stop_continuous_recognition_async().get(),
+            )
+    finally:
+        # Pooled connections stay open until closed, so don't wait for GC
+        close_recognizer(speech_recognizer)
+
+    return " ".join(text for text in utterances if text)
+
+
+async def detect_ffmpeg_resampler():
+    """Resample the 48 kHz -> 16 kHz decode with libsoxr if ffmpeg was built with it"""
+    global ffmpeg_resample_args
+    try:
+        process = await asyncio.create_subprocess_exec(
+            ffmpeg_path,
+            "-hide_banner",
+            "-buildconf",
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+    except OSError as e:
+        logger.error(f"Error reading ffmpeg build configuration: {str(e)}")
+        return
+
+    try:
+        build, _ = await asyncio.wait_for(process.communicate(), timeout=5)
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+        logger.error("Timed out reading ffmpeg build configuration")
+        return
+
+    if b"--enable-libsoxr" in build:
+        ffmpeg_resample_args = ("-af", "aresample=resampler=soxr:precision=20")
+        logger.info("Resampling voice notes with libsoxr")
+
+
+async def download_voice_pcm(file) -> bytes:
+    """Download a Telegram voice file and decode it to PCM without touching disk"""
+    logger.info("Downloading voice message into memory")
+    ogg_data = await file.download_as_bytearray()
+
+    if not ogg_data:
+        raise ValueError("Downloaded voice message is empty")
+
+    logger.info("Decoding OGG to PCM using ffmpeg...")
+    process = await asyncio.create_subprocess_exec(
+        *FFMPEG_DECODE_ARGS,
+        *ffmpeg_resample_args,
+        "pipe:1",
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    pcm, stderr = await process.communicate(bytes(ogg_data))
+
+    if process.returncode != 0:
+        raise RuntimeError(
+            f"ffmpeg exited with code {process.returncode}: "
+            f"{stderr.decode(errors='replace').strip()}"
+        )
+    return pcm
+
+
+async def transcribe_voice(voice, bot) -> str:
+    """Download, decode and transcribe a Telegram voice message"""
+    # Taken before the download so its connection opens while the clip is
+    # fetched and decoded; closed here if that fails, by transcribe_pcm otherwise
+    speech_recognizer = take_recognizer()
+    try:
+        file = await bot.get_file(voice.file_id)
+        pcm = await download_voice_pcm(file)
+    except BaseException:
+        # Includes cancellation, which would otherwise leak the connection too
+        close_recognizer(speech_recognizer)
+        raise
+    return await transcribe_pcm(pcm, speech_recognizer)
+
+
+async def reply_with_summary(
+    message, transcribed_text, closing="", reply_markup=None
+) -> str:
+    """Reply with the transcript straight away and fill in the summary as it streams"""
+    header = f'You said: "{transcribed_text}"\n\nAI Summary: '
+    reply = await message.reply_text(f"{header}…")
+
+    loop = asyncio.get_running_loop()
+    last_edit = loop.time()
+    summary = ""
+    async for summary in stream_summary(transcribed_text):
+        if loop.time() - last_edit >= SUMMARY_EDIT_INTERVAL_SECONDS:
+            await reply.edit_text(f"{header}{summary}…")
+            last_edit = loop.time()
+
+    summary = summary.strip()
+    await reply.edit_text(f"{header}{summary}{closing}", reply_markup=reply_markup)
+    return summary
+
+
+def resident_button(resident):
+    """Selection button for a resident, labelled with their room if known"""
+    name = resident.get("full_name", "Unknown")
+    room = resident.get("room_number", "")
+    display = f"{name} (Room: {room})" if room else name
+    return InlineKeyboardButton(display, callback_data=f"resident_{resident['_id']}")
+
+
 @restricted
 async def voicenote_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Start the voice note process by selecting a resident"""
@@ -398,25 +539,19 @@ async def voicenote_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     residents = await db_service.get_all_residents(limit=20)
 
     if not residents:
-        message = (
-            update.callback_query.message if update.callback_query else update.message
-        )
+        message = get_reply_target(update)
         await message.reply_text("No residents found in the database.")
         return ConversationHandler.END
 
-    keyboard = []
-    for resident in residents:
-        name = resident.get("full_name", "Unknown")
-        room = resident.get("room_number", "")
-        display = f"{name} (Room: {room})" if room else name
+    keyboard = [[resident_button(resident)] for resident in residents]
+    keyboard.append([CANCEL_BUTTON])
 
-        callback_data = f"resident_{resident['_id']}"
-        keyboard.append([InlineKeyboardButton(display, callback_data=callback_data)])
-
-    keyboard.append([InlineKeyboardButton("Cancel", callback_data="cancel")])
+    context.user_data["resident_index"] = {
+        str(resident["_id"]): resident.get("full_name") for resident in residents
+    }
 
     reply_markup = InlineKeyboardMarkup(keyboard)
-    message = update.callback_query.message if update.callback_query else update.message
+    message = get_reply_target(update)
 
     if update.callback_query:
         await message.edit_text(
@@ -432,44 +567,9 @@ async def voicenote_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 async def process_voice_note(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Process the voice note, transcribe it, generate summary and confirm saving"""
-    ogg_path, wav_path = None, None
     try:
-        voice = update.message.voice
-        file = await context.bot.get_file(voice.file_id)
-
-        tmp_dir = os.path.join(os.path.dirname(__file__), "tmp")
-        os.makedirs(tmp_dir, exist_ok=True)
-
-        unique_id = str(uuid.uuid4())
-        ogg_path = os.path.join(tmp_dir, f"{unique_id}.ogg")
-        wav_path = os.path.join(tmp_dir, f"{unique_id}.wav")
-
-        logger.info(f"Downloading voice note to: {ogg_path}")
-        await file.download_to_drive(ogg_path)
-
-        if not os.path.exists(ogg_path) or os.path.getsize(ogg_path) == 0:
-            raise FileNotFoundError(f"OGG file not found or empty at {ogg_path}")
-
-        logger.info("Converting OGG to WAV using ffmpeg-python...")
-        ffmpeg.input(ogg_path).output(wav_path, ac=1, ar=16000).run(
-            overwrite_output=True
-        )
-
-        with wave.open(wav_path, "rb") as wf:
-            logger.info(
-                f"WAV format: {wf.getnchannels()} channels, {wf.getframerate()} Hz, {wf.getsampwidth()} bytes/sample"
-            )
-
-        recognizer = speechsdk.SpeechRecognizer(
-            speech_config=speech_config,
-            audio_config=speechsdk.audio.AudioConfig(filename=wav_path),
-        )
-
-        loop = asyncio.get_running_loop()
         try:
-            result = await asyncio.wait_for(
-                loop.run_in_executor(None, recognizer.recognize_once), timeout=15
-            )
+            transcribed_text = await transcribe_voice(update.message.voice, context.bot)
         except asyncio.TimeoutError:
             logger.error("Speech recognition timed out.")
             await update.message.reply_text(
@@ -477,20 +577,7 @@ async def process_voice_note(update: Update, context: ContextTypes.DEFAULT_TYPE)
             )
             return RECORDING_NOTE
 
-        if result.reason == speechsdk.ResultReason.RecognizedSpeech:
-            transcribed_text = result.text
-
-            ai_summary = await summarize_text(transcribed_text)
-
-            context.user_data["transcription"] = transcribed_text
-            context.user_data["ai_summary"] = ai_summary
-
-            response = (
-                f'You said: "{transcribed_text}"\n\n'
-                f"AI Summary: {ai_summary}\n\n"
-                f"Do you want to save this note for {context.user_data['resident_name']}?"
-            )
-
+        if transcribed_text:
             keyboard = [
                 [
                     InlineKeyboardButton(
@@ -500,11 +587,19 @@ async def process_voice_note(update: Update, context: ContextTypes.DEFAULT_TYPE)
                         "Save Full Transcript", callback_data="save_transcript"
                     ),
                 ],
-                [InlineKeyboardButton("Cancel", callback_data="cancel")],
+                [CANCEL_BUTTON],
             ]
             reply_markup = InlineKeyboardMarkup(keyboard)
 
-            await update.message.reply_text(response, reply_markup=reply_markup)
+            ai_summary = await reply_with_summary(
+                update.message,
+                transcribed_text,
+                closing=f"\n\nDo you want to save this note for {context.user_data['resident_name']}?",
+                reply_markup=reply_markup,
+            )
+
+            context.user_data["transcription"] = transcribed_text
+            context.user_data["ai_summary"] = ai_summary
             return CONFIRMING_NOTE
         else:
             await update.message.reply_text(
@@ -518,58 +613,12 @@ async def process_voice_note(update: Update, context: ContextTypes.DEFAULT_TYPE)
             "Something went wrong while processing your voice note. Please try again."
         )
         return RECORDING_NOTE
-    finally:
-        for path in [ogg_path, wav_path]:
-            try:
-                if path and os.path.exists(path):
-                    os.remove(path)
-            except PermissionError:
-                logger.warning(
-                    f"Could not delete file {path} because it is still in use."
-                )
 
 
 async def handle_voice(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    ogg_path, wav_path = None, None
     try:
-        voice = update.message.voice
-        file = await context.bot.get_file(voice.file_id)
-
-        tmp_dir = os.path.join(os.path.dirname(__file__), "tmp")
-        os.makedirs(tmp_dir, exist_ok=True)
-
-        unique_id = str(uuid.uuid4())
-        ogg_path = os.path.join(tmp_dir, f"{unique_id}.ogg")
-        wav_path = os.path.join(tmp_dir, f"{unique_id}.wav")
-
-        logger.info(f"Downloading voice to: {ogg_path}")
-        await file.download_to_drive(ogg_path)
-
-        if not os.path.exists(ogg_path) or os.path.getsize(ogg_path) == 0:
-            raise FileNotFoundError(f"OGG file not found or empty at {ogg_path}")
-
-        logger.info(f"FFMPEG HERE:{ffmpeg_path}")
-
-        logger.info("Converting OGG to WAV using ffmpeg-python...")
-        ffmpeg.input(ogg_path).output(wav_path, ac=1, ar=16000).run(
-            overwrite_output=True
-        )
-
-        with wave.open(wav_path, "rb") as wf:
-            logger.info(
-                f"WAV format: {wf.getnchannels()} channels, {wf.getframerate()} Hz, {wf.getsampwidth()} bytes/sample"
-            )
-
-        recognizer = speechsdk.SpeechRecognizer(
-            speech_config=speech_config,
-            audio_config=speechsdk.audio.AudioConfig(filename=wav_path),
-        )
-
-        loop = asyncio.get_running_loop()
         try:
-            result = await asyncio.wait_for(
-                loop.run_in_executor(None, recognizer.recognize_once), timeout=15
-            )
+            transcribed_text = await transcribe_voice(update.message.voice, context.bot)
         except asyncio.TimeoutError:
             logger.error("Speech recognition timed out.")
             await update.message.reply_text(
@@ -577,14 +626,8 @@ async def handle_voice(update: Update, context: ContextTypes.DEFAULT_TYPE):
             )
             return
 
-        if result.reason == speechsdk.ResultReason.RecognizedSpeech:
-            transcribed_text = result.text
-
-            ai_summary = await summarize_text(transcribed_text)
-
-            response = f'You said: "{transcribed_text}"\n\nAI Summary: {ai_summary}'
-
-            await update.message.reply_text(response)
+        if transcribed_text:
+            await reply_with_summary(update.message, transcribed_text)
         else:
             await update.message.reply_text("Sorry, I couldn't understand the audio.")
 
@@ -593,15 +636,6 @@ async def handle_voice(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text(
             "Something went wrong while processing your voice."
         )
-    finally:
-        for path in [ogg_path, wav_path]:
-            try:
-                if path and os.path.exists(path):
-                    os.remove(path)
-            except PermissionError:
-                logger.warning(
-                    f"Could not delete file {path} because it is still in use."
-                )
 
 
 async def save_note(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -639,8 +673,24 @@ async def save_note(update: Update, context: ContextTypes.DEFAULT_TYPE):
     return ConversationHandler.END
 
 
-def main():
-    application = Application.builder().token(ASSISTANT_BOT_TOKEN).build()
+async def post_init(application: Application):
+    await db_service.ensure_indexes()
+    await detect_ffmpeg_resampler()
+    fill_recognizer_pool()
+
+
+def build_application() -> Application:
+    """Assistant bot application with all of its handlers registered"""
+    application = (
+        Application.builder()
+        .token(ASSISTANT_BOT_TOKEN)
+        .request(
+            HTTPXRequest(connection_pool_size=256, httpx_kwargs={"verify": SSL_CONTEXT})
+        )
+        .get_updates_request(HTTPXRequest(httpx_kwargs={"verify": SSL_CONTEXT}))
+        .post_init(post_init)
+        .build()
+    )
 
     application.add_handler(CommandHandler("start", start))
     application.add_handler(CommandHandler("residents", list_residents))
@@ -672,8 +722,33 @@ def main():
         TelegramMessageHandler(filters.TEXT & ~filters.COMMAND, handle_message)
     )
 
+    return application
+
+
+def main():
+    try:
+        # libuv-backed event loop where available (not on Windows)
+        import uvloop
+
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except ImportError:
+        pass
+
+    application = build_application()
+
     logger.info("Starting Assistant Bot...")
-    application.run_polling(allowed_updates=Update.ALL_TYPES)
+    if ASSISTANT_BOT_WEBHOOK_URL:
+        # Telegram pushes updates to us instead of being polled for them
+        application.run_webhook(
+            listen="0.0.0.0",
+            port=ASSISTANT_BOT_WEBHOOK_PORT,
+            url_path="assistant",
+            webhook_url=f"{ASSISTANT_BOT_WEBHOOK_URL.rstrip('/')}/assistant",
+            secret_token=WEBHOOK_SECRET_TOKEN,
+            allowed_updates=Update.ALL_TYPES,
+        )
+    else:
+        application.run_polling(allowed_updates=Update.ALL_TYPES)
     logger.info("Assistant Bot stopped")
 
 
@@ -1,29 +1,53 @@
 import logging
-from openai import AsyncOpenAI
-from utils.config import OPENAI_API_KEY
+from hashlib import blake2b
+from cachetools import LRUCache
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+from utils.config import OPENAI_API_KEY, SSL_CONTEXT
 
 logger = logging.getLogger(__name__)
 
-client = AsyncOpenAI(api_key=OPENAI_API_KEY, http_client=None)
+client = AsyncOpenAI(
+    api_key=OPENAI_API_KEY, http_client=DefaultAsyncHttpxClient(verify=SSL_CONTEXT)
+)
 
 
-async def summarize_text(text):
+# Upper bound on a summary request, so a slow API can't hold a voice note open
+SUMMARY_TIMEOUT_SECONDS = 20
+
+# Transcript digest -> summary; routine notes are often dictated word for word
+summary_cache = LRUCache(maxsize=512)
+
+
+def transcript_key(text):
+    """Cache key for a transcript, ignoring case and spacing differences"""
+    normalized = " ".join(text.lower().split())
+    return blake2b(normalized.encode(), digest_size=16).hexdigest()
+
+
+async def stream_summary(text):
     """
-    Summarize the given text using OpenAI's GPT model.
+    Stream a summary of the given text from OpenAI's GPT model.
 
     Args:
         text (str): The transcribed text to summarize
 
-    Returns:
-        str: Summarized text
+    Yields:
+        str: The summary so far, growing as tokens arrive
     """
     try:
         if not text.strip():
-            return "No text to summarize."
+            yield "No text to summarize."
+            return
+
+        cache_key = transcript_key(text)
+        cached = summary_cache.get(cache_key)
+        if cached is not None:
+            yield cached
+            return
 
         prompt = f"Please summarize and refine the following spoken text into concise notes:\n\n{text}"
 
-        response = await client.chat.completions.create(
+        stream = await client.chat.completions.create(
             model="gpt-3.5-turbo",
             messages=[
                 {
@@ -34,12 +58,19 @@ async def summarize_text(text):
             ],
             max_tokens=100,
             temperature=0.5,
+            stream=True,
+            timeout=SUMMARY_TIMEOUT_SECONDS,
         )
 
-        summary = response.choices[0].message.content.strip()
-        logger.info(f"Generated summary for text: {text[:50]}...")
+        summary = ""
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                summary += chunk.choices[0].delta.content
+                yield summary
 
-        return summary
+        if summary:
+            summary_cache[cache_key] = summary
+        logger.info(f"Generated summary for text: {text[:50]}...")
     except Exception as e:
-        logger.error(f"Error in summarize_text: {e}")
-        return f"An error occurred while generating a summary: {str(e)}"
+        logger.error(f"Error in stream_summary: {e}")
+        yield f"An error occurred while generating a summary: {str(e)}"
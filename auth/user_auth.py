@@ -1,19 +1,42 @@
 import logging
 from functools import wraps
-from motor.motor_asyncio import AsyncIOMotorClient
 from telegram import Update
 from telegram.ext import ContextTypes
-from utils.config import MONGO_URI
+from cachetools import TTLCache
+from utils.mongo import CASE_INSENSITIVE, get_mongo_client
 
 logging.basicConfig(
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s", level=logging.INFO
 )
 logger = logging.getLogger(__name__)
 
-mongo_client = AsyncIOMotorClient(MONGO_URI, tlsAllowInvalidCertificates=True)
+mongo_client = get_mongo_client()
 db = mongo_client["caregiver"]
 users_collection = db["users"]
 
+# Telegram handle -> staff user, shared by @restricted and the auth callback
+user_cache = TTLCache(maxsize=1024, ttl=300)
+
+
+async def get_user_by_telegram_handle(handle: str):
+    """Find a staff user by Telegram handle, ignoring case and a leading '@'"""
+    if not handle:
+        return None
+
+    handle = handle.lstrip("@")
+    cache_key = handle.lower()
+    user = user_cache.get(cache_key)
+    if user is not None:
+        return user
+
+    user = await users_collection.find_one(
+        {"telegram_handle": handle}, collation=CASE_INSENSITIVE
+    )
+    # Misses aren't cached, so a newly registered user gets in straight away
+    if user:
+        user_cache[cache_key] = user
+    return user
+
 
 def restricted(func):
     @wraps(func)
@@ -23,7 +46,10 @@ def restricted(func):
         user_id = update.effective_user.id
         username = update.effective_user.username
 
-        user = await users_collection.find_one({"telegram_handle": username})
+        # Users without a Telegram username can't be registered, so skip the lookup
+        user = None
+        if username:
+            user = await get_user_by_telegram_handle(username)
 
         if not user:
             await update.message.reply_text(
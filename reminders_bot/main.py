@@ -4,6 +4,7 @@ import logging
 
 from telegram import Update
 from telegram.ext import Application, CommandHandler, ContextTypes, CallbackQueryHandler
+from telegram.request import HTTPXRequest
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 from apscheduler.triggers.cron import CronTrigger
@@ -16,7 +17,13 @@ from reminders_bot.services.fall_detection_service import (
     handle_fall_response,
 )
 from auth.user_auth import restricted
-from utils.config import REMINDERS_BOT_TOKEN
+from utils.config import (
+    REMINDERS_BOT_TOKEN,
+    REMINDERS_BOT_WEBHOOK_URL,
+    REMINDERS_BOT_WEBHOOK_PORT,
+    WEBHOOK_SECRET_TOKEN,
+    SSL_CONTEXT,
+)
 from reminders_bot.chat_registry import user_chat_map, user_name_map
 
 logging.basicConfig(
@@ -66,7 +73,15 @@ async def refresh(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 async def run_bot():
     """Async function to run the bot with proper event loop management"""
-    application = Application.builder().token(REMINDERS_BOT_TOKEN).build()
+    application = (
+        Application.builder()
+        .token(REMINDERS_BOT_TOKEN)
+        .request(
+            HTTPXRequest(connection_pool_size=256, httpx_kwargs={"verify": SSL_CONTEXT})
+        )
+        .get_updates_request(HTTPXRequest(httpx_kwargs={"verify": SSL_CONTEXT}))
+        .build()
+    )
 
     application.add_handler(CommandHandler("start", start))
     application.add_handler(CommandHandler("refresh", refresh))
@@ -118,7 +133,17 @@ async def run_bot():
     await application.start()
 
     logger.info("Starting Reminders Bot...")
-    await application.updater.start_polling()
+    if REMINDERS_BOT_WEBHOOK_URL:
+        # Telegram pushes updates to us instead of being polled for them
+        await application.updater.start_webhook(
+            listen="0.0.0.0",
+            port=REMINDERS_BOT_WEBHOOK_PORT,
+            url_path="reminders",
+            webhook_url=f"{REMINDERS_BOT_WEBHOOK_URL.rstrip('/')}/reminders",
+            secret_token=WEBHOOK_SECRET_TOKEN,
+        )
+    else:
+        await application.updater.start_polling()
 
     try:
         while True:
@@ -135,6 +160,14 @@ async def run_bot():
 
 def main():
     """Entry point that runs the async bot function"""
+    try:
+        # libuv-backed event loop where available (not on Windows)
+        import uvloop
+
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except ImportError:
+        pass
+
     try:
         asyncio.run(run_bot())
     except KeyboardInterrupt:
@@ -3,7 +3,7 @@ import aiohttp
 from datetime import datetime, timedelta, timezone
 from telegram import Bot
 
-from utils.config import API_BASE_URL, REMINDERS_BOT_TOKEN
+from utils.config import API_BASE_URL, REMINDERS_BOT_TOKEN, SSL_CONTEXT
 from reminders_bot.chat_registry import user_chat_map
 
 logging.basicConfig(
@@ -21,7 +21,9 @@ async def fetch_activities(user_id=None):
         user_id: Optional user ID to filter activities by creator
     """
     try:
-        async with aiohttp.ClientSession() as session:
+        async with aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(ssl=SSL_CONTEXT)
+        ) as session:
             now_utc = datetime.now(timezone.utc)
 
             end_time_utc = now_utc + timedelta(days=2)
@@ -186,7 +188,9 @@ async def send_reminder(activity, start_time, chat_id):
 
 async def mark_reminder_sent(activity_id):
     url = f"{API_BASE_URL}/activities/{activity_id}/mark_reminder_sent"
-    async with aiohttp.ClientSession() as session:
+    async with aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(ssl=SSL_CONTEXT)
+    ) as session:
         try:
             async with session.patch(url) as response:
                 if response.status == 200:
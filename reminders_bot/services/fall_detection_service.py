@@ -5,7 +5,7 @@ import aiohttp
 from telegram.ext import ContextTypes
 
 
-from utils.config import API_BASE_URL, REMINDERS_BOT_TOKEN
+from utils.config import API_BASE_URL, REMINDERS_BOT_TOKEN, SSL_CONTEXT
 from reminders_bot.chat_registry import user_chat_map
 
 logger = logging.getLogger(__name__)
@@ -68,7 +68,9 @@ async def process_fall_alerts(context=None):
 async def fetch_fall_logs():
     """Fetch fall logs"""
     try:
-        async with aiohttp.ClientSession() as session:
+        async with aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(ssl=SSL_CONTEXT)
+        ) as session:
             now_utc = datetime.now(timezone.utc)
             start_time = (now_utc - timedelta(seconds=5)).isoformat()
 
@@ -150,7 +152,9 @@ async def handle_fall_response(update: Update, context: ContextTypes.DEFAULT_TYP
     )
 
     try:
-        async with aiohttp.ClientSession() as session:
+        async with aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(ssl=SSL_CONTEXT)
+        ) as session:
             url = f"{API_BASE_URL}/fall-detection/log/{fall_id}/status?status={new_status}"
             response = await session.patch(url)
 
@@ -166,7 +170,9 @@ async def handle_fall_response(update: Update, context: ContextTypes.DEFAULT_TYP
 
 async def get_resident_name(resident_id: str) -> str:
     try:
-        async with aiohttp.ClientSession() as session:
+        async with aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(ssl=SSL_CONTEXT)
+        ) as session:
             url = f"{API_BASE_URL}/residents/{resident_id}"
             logger.info(f"Fetching resident name from: {url}")
             async with session.get(url) as response:
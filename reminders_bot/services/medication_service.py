@@ -7,7 +7,7 @@ from telegram import Bot
 from dateutil import parser
 
 
-from utils.config import API_BASE_URL, REMINDERS_BOT_TOKEN
+from utils.config import API_BASE_URL, REMINDERS_BOT_TOKEN, SSL_CONTEXT
 from reminders_bot.chat_registry import user_chat_map, user_name_map
 
 logging.basicConfig(
@@ -27,7 +27,9 @@ async def fetch_residents(user_name):
         user_name: Name of the current user
     """
     try:
-        async with aiohttp.ClientSession() as session:
+        async with aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(ssl=SSL_CONTEXT)
+        ) as session:
             residents_url = (
                 f"{API_BASE_URL}/residents/getAllResidents?caregiver_name={user_name}"
             )
@@ -60,7 +62,9 @@ async def fetch_medications(resident_id):
         resident_id: ID of the resident
     """
     try:
-        async with aiohttp.ClientSession() as session:
+        async with aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(ssl=SSL_CONTEXT)
+        ) as session:
             now_sg = datetime.now(sg)
 
             current_date = now_sg.strftime("%Y-%m-%d")
@@ -3,7 +3,7 @@ import aiohttp
 from datetime import datetime, timedelta, timezone
 from telegram import Bot
 
-from utils.config import API_BASE_URL, REMINDERS_BOT_TOKEN
+from utils.config import API_BASE_URL, REMINDERS_BOT_TOKEN, SSL_CONTEXT
 from reminders_bot.chat_registry import user_chat_map
 
 logging.basicConfig(
@@ -21,7 +21,9 @@ async def fetch_tasks(user_id=None):
         user_id: Optional user ID to filter tasks by creator
     """
     try:
-        async with aiohttp.ClientSession() as session:
+        async with aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(ssl=SSL_CONTEXT)
+        ) as session:
             now_utc = datetime.now(timezone.utc)
 
             current_date = now_utc.strftime("%Y-%m-%d")
@@ -184,7 +186,9 @@ async def send_task_reminder(task, start_time, chat_id):
 async def mark_task_reminder_sent(task_id):
     """Mark a task reminder as sent in the backend"""
     url = f"{API_BASE_URL}/tasks/{task_id}/mark_reminder_sent"
-    async with aiohttp.ClientSession() as session:
+    async with aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(ssl=SSL_CONTEXT)
+    ) as session:
         try:
             async with session.patch(url) as response:
                 if response.status == 200:
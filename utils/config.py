@@ -1,6 +1,7 @@
 import os
 import certifi
 import shutil
+import ssl
 import azure.cognitiveservices.speech as speechsdk
 from dotenv import load_dotenv
 
@@ -9,6 +10,10 @@ load_dotenv()
 os.environ["SSL_CERT_FILE"] = certifi.where()
 os.environ["REQUESTS_CA_BUNDLE"] = certifi.where()
 
+# One verified TLS context for the clients we build ourselves (OpenAI, Telegram,
+# aiohttp); the env vars above remain for libraries that only read those
+SSL_CONTEXT = ssl.create_default_context(cafile=certifi.where())
+
 # Environment Variables
 API_BASE_URL = os.getenv("API_BASE_URL")
 API_EMAIL = os.getenv("API_EMAIL")
@@ -20,6 +25,13 @@ AZURE_SPEECH_KEY = os.getenv("AZURE_SPEECH_KEY")
 AZURE_SPEECH_ENDPOINT = os.getenv("AZURE_SPEECH_ENDPOINT")
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
+# Webhook Configuration (bots fall back to long polling when no URL is set)
+ASSISTANT_BOT_WEBHOOK_URL = os.getenv("ASSISTANT_BOT_WEBHOOK_URL")
+ASSISTANT_BOT_WEBHOOK_PORT = int(os.getenv("ASSISTANT_BOT_WEBHOOK_PORT", "8443"))
+REMINDERS_BOT_WEBHOOK_URL = os.getenv("REMINDERS_BOT_WEBHOOK_URL")
+REMINDERS_BOT_WEBHOOK_PORT = int(os.getenv("REMINDERS_BOT_WEBHOOK_PORT", "8444"))
+WEBHOOK_SECRET_TOKEN = os.getenv("WEBHOOK_SECRET_TOKEN")
+
 # FFmpeg Configuration
 ffmpeg_path = shutil.which("ffmpeg") or shutil.which("ffmpeg.exe")
 
@@ -0,0 +1,24 @@
+import certifi
+from functools import lru_cache
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.collation import Collation
+from utils.config import MONGO_URI
+
+# Case-insensitive comparison; queries must pass it to use the matching index
+CASE_INSENSITIVE = Collation(locale="en", strength=2)
+
+
+@lru_cache(maxsize=1)
+def get_mongo_client() -> AsyncIOMotorClient:
+    """Process-wide Mongo client, so every module shares one connection pool"""
+    return AsyncIOMotorClient(
+        MONGO_URI,
+        tlsCAFile=certifi.where(),
+        maxPoolSize=50,
+        minPoolSize=5,
+        serverSelectionTimeoutMS=3000,
+        maxIdleTimeMS=30_000,
+        retryWrites=True,
+        # zstd needs the zstandard package; pymongo skips it if that's missing
+        compressors="zstd,zlib",
+    )